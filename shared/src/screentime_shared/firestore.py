@@ -3,46 +3,38 @@
 Handles conversion between Python snake_case and Firestore camelCase.
 """
 
-import re
-from datetime import datetime
+from functools import lru_cache
 from typing import Any
 
 from pydantic import BaseModel
 
 
+@lru_cache(maxsize=512)
 def to_camel(string: str) -> str:
     """Convert snake_case to camelCase."""
     components = string.split("_")
     return components[0] + "".join(x.title() for x in components[1:])
 
 
+@lru_cache(maxsize=512)
 def to_snake(string: str) -> str:
     """Convert camelCase to snake_case."""
-    return re.sub(r"(?<!^)(?=[A-Z])", "_", string).lower()
+    out = [string[:1]]
+    for ch in string[1:]:
+        if "A" <= ch <= "Z":
+            out.append("_")
+        out.append(ch)
+    return "".join(out).lower()
 
 
 def model_to_firestore(model: BaseModel) -> dict[str, Any]:
     """Convert a pydantic model to Firestore document format.
 
-    - Converts field names from snake_case to camelCase
-    - Converts datetime to Firestore-compatible format
-    - Converts enums to their string values
+    Field names are emitted as camelCase via the model's alias generator,
+    so models must declare ``alias_generator=to_camel``. Datetimes and
+    enums are passed through for the Firestore SDK to encode.
     """
-    data = model.model_dump(mode="python")
-    return _convert_keys_to_camel(data)
-
-
-def _convert_keys_to_camel(data: dict[str, Any]) -> dict[str, Any]:
-    result: dict[str, Any] = {}
-    for key, value in data.items():
-        camel_key = to_camel(key)
-        if isinstance(value, dict):
-            result[camel_key] = _convert_keys_to_camel(value)
-        elif isinstance(value, datetime):
-            result[camel_key] = value
-        else:
-            result[camel_key] = value
-    return result
+    return model.model_dump(mode="python", by_alias=True)
 
 
 def firestore_to_dict(data: dict[str, Any]) -> dict[str, Any]:
@@ -52,10 +44,15 @@ def firestore_to_dict(data: dict[str, Any]) -> dict[str, Any]:
 
 def _convert_keys_to_snake(data: dict[str, Any]) -> dict[str, Any]:
     result: dict[str, Any] = {}
-    for key, value in data.items():
-        snake_key = to_snake(key)
-        if isinstance(value, dict):
-            result[snake_key] = _convert_keys_to_snake(value)
-        else:
-            result[snake_key] = value
+    stack = [(data, result)]
+    while stack:
+        src, dst = stack.pop()
+        for key, value in src.items():
+            snake_key = to_snake(key)
+            if type(value) is dict:
+                nested: dict[str, Any] = {}
+                dst[snake_key] = nested
+                stack.append((value, nested))
+            else:
+                dst[snake_key] = value
     return result
@@ -10,6 +10,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from .firestore import to_camel
+
 
 class Platform(StrEnum):
     WINDOWS = "windows"
@@ -37,7 +39,7 @@ class MemberRole(StrEnum):
 class Family(BaseModel):
     """Firestore: families/{familyId}"""
 
-    model_config = ConfigDict(populate_by_name=True)
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
 
     name: str
     created_at: datetime
@@ -49,6 +51,8 @@ class Family(BaseModel):
 class Device(BaseModel):
     """Firestore: devices/{deviceId}"""
 
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
     family_id: str
     user_id: str
     name: str
@@ -66,6 +70,8 @@ class User(BaseModel):
     Represents a child user in the family.
     """
 
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
     family_id: str
     name: str
     daily_limit_minutes: Annotated[int, Field(ge=0)] = 120
@@ -80,6 +86,8 @@ class WhitelistItem(BaseModel):
     Apps in the whitelist don't count toward time budget.
     """
 
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
     family_id: str
     platform: Platform
     identifier: str  # exe name (Windows) or package name (Android)
@@ -90,6 +98,8 @@ class WhitelistItem(BaseModel):
 class ExtensionRequest(BaseModel):
     """Firestore: extensionRequests/{requestId}"""
 
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
     family_id: str
     user_id: str
     device_id: str
@@ -108,6 +118,8 @@ class UsageLog(BaseModel):
     Historical usage data for analytics.
     """
 
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
     family_id: str
     user_id: str
     device_id: str
@@ -1,31 +1,17 @@
 """Local cache for offline operation."""
 
-import json
 import logging
-from dataclasses import dataclass
-from datetime import datetime
+import os
 from pathlib import Path
 
-from pydantic import BaseModel
+import orjson
+from pydantic import TypeAdapter
 
 from screentime_shared import WhitelistItem
-from screentime_shared.firestore import firestore_to_dict
 
 logger = logging.getLogger(__name__)
 
-
-class CachedWhitelist(BaseModel):
-    """Cached whitelist with timestamp."""
-
-    items: list[WhitelistItem]
-    cached_at: datetime
-
-
-class PendingTimeIncrement(BaseModel):
-    """Time increment that couldn't be synced due to offline state."""
-
-    seconds: float
-    timestamp: datetime
+_WHITELIST_ADAPTER = TypeAdapter(list[WhitelistItem])
 
 
 class LocalCache:
@@ -34,6 +20,8 @@ class LocalCache:
     def __init__(self, cache_dir: Path):
         self._cache_dir = cache_dir
         self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._pending_seconds = self._load_pending_time()
+        self._last_saved_user_state: tuple[int, float, str] | None = None
 
     @property
     def _whitelist_path(self) -> Path:
@@ -48,9 +36,11 @@ class LocalCache:
         return self._cache_dir / "user_state.json"
 
     def save_whitelist(self, items: list[WhitelistItem]) -> None:
-        """Cache whitelist locally."""
-        cached = CachedWhitelist(items=items, cached_at=datetime.now())
-        self._whitelist_path.write_text(cached.model_dump_json(indent=2))
+        """Cache whitelist locally.
+
+        The file's modification time records when it was cached.
+        """
+        self._whitelist_path.write_bytes(_WHITELIST_ADAPTER.dump_json(items, indent=2))
         logger.debug("Saved %d whitelist items to cache", len(items))
 
     def load_whitelist(self) -> list[WhitelistItem] | None:
@@ -58,18 +48,21 @@ class LocalCache:
         if not self._whitelist_path.exists():
             return None
         try:
-            cached = CachedWhitelist.model_validate_json(self._whitelist_path.read_text())
-            logger.debug("Loaded %d whitelist items from cache", len(cached.items))
-            return cached.items
+            data = orjson.loads(self._whitelist_path.read_bytes())
+            if isinstance(data, dict):
+                # Older versions wrapped the list as {"items": [...], "cached_at": ...}
+                data = data["items"]
+            items = _WHITELIST_ADAPTER.validate_python(data)
+            logger.debug("Loaded %d whitelist items from cache", len(items))
+            return items
         except Exception:
             logger.exception("Failed to load whitelist cache")
             return None
 
     def add_pending_time(self, seconds: float) -> None:
         """Add time that couldn't be synced to Firestore."""
-        pending = self._load_pending_time()
-        pending.append(PendingTimeIncrement(seconds=seconds, timestamp=datetime.now()))
-        self._save_pending_time(pending)
+        self._pending_seconds += seconds
+        self._save_pending_time()
         logger.debug("Added %.1f seconds to pending time queue", seconds)
 
     def get_and_clear_pending_time(self) -> float:
@@ -77,27 +70,29 @@ class LocalCache:
 
         Returns total seconds that need to be synced.
         """
-        pending = self._load_pending_time()
-        if not pending:
+        total = self._pending_seconds
+        if not total:
             return 0.0
-        total = sum(p.seconds for p in pending)
-        self._save_pending_time([])
+        self._pending_seconds = 0.0
+        self._save_pending_time()
         logger.debug("Cleared %.1f seconds from pending time queue", total)
         return total
 
-    def _load_pending_time(self) -> list[PendingTimeIncrement]:
+    def _load_pending_time(self) -> float:
         if not self._pending_time_path.exists():
-            return []
+            return 0.0
         try:
-            data = json.loads(self._pending_time_path.read_text())
-            return [PendingTimeIncrement.model_validate(item) for item in data]
+            data = orjson.loads(self._pending_time_path.read_bytes())
+            if isinstance(data, list):
+                # Older versions stored a list of {"seconds", "timestamp"} entries
+                return float(sum(item["seconds"] for item in data))
+            return float(data["seconds"])
         except Exception:
             logger.exception("Failed to load pending time cache")
-            return []
+            return 0.0
 
-    def _save_pending_time(self, pending: list[PendingTimeIncrement]) -> None:
-        data = [p.model_dump(mode="json") for p in pending]
-        self._pending_time_path.write_text(json.dumps(data, indent=2, default=str))
+    def _save_pending_time(self) -> None:
+        self._pending_time_path.write_bytes(orjson.dumps({"seconds": self._pending_seconds}))
 
     def save_user_state(
         self,
@@ -105,20 +100,30 @@ class LocalCache:
         today_used_minutes: float,
         last_reset_date: str,
     ) -> None:
-        """Cache user state locally."""
+        """Cache user state locally.
+
+        Skips the write if the state is unchanged since the last save.
+        """
+        key = (daily_limit_minutes, today_used_minutes, last_reset_date)
+        if key == self._last_saved_user_state:
+            return
         state = {
             "dailyLimitMinutes": daily_limit_minutes,
             "todayUsedMinutes": today_used_minutes,
             "lastResetDate": last_reset_date,
         }
-        self._user_state_path.write_text(json.dumps(state, indent=2))
+        # Write to a temp file and swap it in so a crash can't leave a partial file
+        tmp_path = self._user_state_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(orjson.dumps(state))
+        os.replace(tmp_path, self._user_state_path)
+        self._last_saved_user_state = key
 
     def load_user_state(self) -> dict | None:
         """Load cached user state. Returns None if no cache exists."""
         if not self._user_state_path.exists():
             return None
         try:
-            data = json.loads(self._user_state_path.read_text())
+            data = orjson.loads(self._user_state_path.read_bytes())
             return {
                 "daily_limit_minutes": data["dailyLimitMinutes"],
                 "today_used_minutes": data["todayUsedMinutes"],
@@ -1,11 +1,14 @@
 """Configuration for the Windows client."""
 
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
-from pydantic import BaseModel
+import orjson
 
 
-class Config(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Config:
     """Local configuration for this device."""
 
     device_id: str
@@ -17,5 +20,22 @@ class Config(BaseModel):
 
 
 def load_config(path: Path) -> Config:
-    """Load configuration from a JSON file."""
-    return Config.model_validate_json(path.read_text())
+    """Load configuration from a JSON file.
+
+    The parsed config is reused until the file's modification time changes.
+    """
+    return _load_config(path, path.stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=4)
+def _load_config(path: Path, mtime_ns: int) -> Config:
+    """Parse a config file; mtime_ns is only part of the cache key."""
+    data = orjson.loads(path.read_bytes())
+    return Config(
+        device_id=data["device_id"],
+        device_name=data["device_name"],
+        family_id=data["family_id"],
+        user_id=data["user_id"],
+        firebase_credentials_path=Path(data["firebase_credentials_path"]),
+        poll_interval_seconds=int(data.get("poll_interval_seconds", 10)),
+    )
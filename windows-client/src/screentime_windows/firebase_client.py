@@ -1,11 +1,19 @@
 """Firebase/Firestore client for the Windows service."""
 
+import logging
+import threading
+from collections.abc import Mapping, Sequence
 from datetime import UTC, datetime
+from typing import Any
 
-from google.cloud.firestore import Client, Transaction  # type: ignore[import-untyped]
+from google.cloud.firestore import Client, Increment  # type: ignore[import-untyped]
+from pydantic import TypeAdapter, ValidationError
 
 from screentime_shared import ExtensionRequest, Platform, RequestStatus, User, WhitelistItem
-from screentime_shared.firestore import firestore_to_dict
+
+logger = logging.getLogger(__name__)
+
+_WHITELIST_ADAPTER = TypeAdapter(list[WhitelistItem])
 
 
 class FirestoreClient:
@@ -24,95 +32,183 @@ class FirestoreClient:
         self._device_name = device_name
         self._family_id = family_id
         self._user_id = user_id
+        self._user_ref = db.collection("users").document(user_id)
+        self._device_ref = db.collection("devices").document(device_id)
+        self._usage_logs = db.collection("usageLogs")
+        self._extension_requests = db.collection("extensionRequests")
+
+        self._whitelist_query = (
+            db.collection("whitelist")
+            .where("familyId", "==", family_id)
+            .where("platform", "in", [Platform.WINDOWS.value, Platform.BOTH.value])
+        )
+        self._approved_extensions_query = (
+            self._extension_requests
+            .where("deviceId", "==", device_id)
+            .where("status", "==", RequestStatus.APPROVED.value)
+        )
+
+        # Whitelist kept up to date by a snapshot listener, keyed by document ID.
+        # None until the listener has delivered its first snapshot.
+        self._whitelist_items: dict[str, WhitelistItem] | None = None
+        self._whitelist_lock = threading.Lock()
+        self._whitelist_watch = self._whitelist_query.on_snapshot(
+            self._on_whitelist_snapshot
+        )
 
-    def update_device_status(
+    def commit_tick(
         self,
-        current_app: str | None,
-        current_app_package: str | None,
+        used_seconds: float,
+        usage_logs: Sequence[tuple[str, float, bool]] = (),
     ) -> None:
-        """Update this device's status in Firestore."""
-        doc_ref = self._db.collection("devices").document(self._device_id)
-        doc_ref.update(
+        """Write one tick's used time and usage logs in a single batch.
+
+        Adds used_seconds to the user's used time if non-zero, and creates a
+        usage log for each (app_identifier, minutes, was_whitelisted) in
+        usage_logs. Does nothing if there is nothing to write.
+        """
+        if not used_seconds and not usage_logs:
+            return
+        batch = self._db.batch()
+        if used_seconds:
+            batch.update(self._user_ref, {"todayUsedMinutes": Increment(used_seconds / 60.0)})
+        self._add_usage_logs(batch, usage_logs)
+        batch.commit()
+
+    def update_device_status(self, current_app: str | None) -> None:
+        """Update this device's current app and last seen time."""
+        self._device_ref.update(
             {
                 "currentApp": current_app,
-                "currentAppPackage": current_app_package,
+                "currentAppPackage": current_app,
                 "lastSeen": datetime.now(),
             }
         )
 
+    def log_app_usage(self, usage_logs: Sequence[tuple[str, float, bool]]) -> None:
+        """Create usage logs for (app_identifier, minutes, was_whitelisted) entries."""
+        batch = self._db.batch()
+        self._add_usage_logs(batch, usage_logs)
+        batch.commit()
+
     def get_user(self) -> User:
         """Get the current user document."""
-        doc = self._db.collection("users").document(self._user_id).get()
+        doc = self._user_ref.get()
         if not doc.exists:
             raise ValueError(f"User {self._user_id} not found")
-        return User.model_validate(firestore_to_dict(doc.to_dict()))
+        return User.model_validate(doc.to_dict())
 
     def increment_used_time(self, seconds: float) -> float:
         """Atomically increment the user's used time.
 
         Returns the new total used minutes.
         """
-        user_ref = self._db.collection("users").document(self._user_id)
+        # Server-side increment: no read-modify-write transaction to retry
+        self._user_ref.update({"todayUsedMinutes": Increment(seconds / 60.0)})
+        return self.get_used_minutes()
 
-        @self._db.transaction
-        def update_in_transaction(transaction: Transaction) -> float:
-            user_doc = user_ref.get(transaction=transaction)
-            if not user_doc.exists:
-                raise ValueError(f"User {self._user_id} not found")
+    def get_used_minutes(self) -> float:
+        """Get the user's used minutes today, including other devices' time."""
+        user_doc = self._user_ref.get(field_paths=["todayUsedMinutes"])
+        return float(user_doc.get("todayUsedMinutes"))
 
-            data = user_doc.to_dict()
-            current_minutes = data.get("todayUsedMinutes", 0.0)
-            new_minutes = current_minutes + (seconds / 60.0)
+    def get_whitelist(self, force_refresh: bool = False) -> list[WhitelistItem]:
+        """Get all whitelist items for this family that apply to Windows.
 
-            transaction.update(user_ref, {"todayUsedMinutes": new_minutes})
-            return new_minutes
+        Served from the snapshot listener once it has delivered a snapshot
+        and while it is still streaming. Pass force_refresh to query Firestore
+        directly, e.g. to probe whether the connection is back.
+        """
+        if not force_refresh:
+            with self._whitelist_lock:
+                if self._whitelist_items is not None and not self._whitelist_watch.is_active:
+                    # The listener stopped, so its items would go stale
+                    logger.warning("Whitelist listener stopped, querying instead")
+                    self._whitelist_items = None
+                if self._whitelist_items is not None:
+                    return list(self._whitelist_items.values())
+
+        return _WHITELIST_ADAPTER.validate_python(
+            [doc.to_dict() for doc in self._whitelist_query.stream()]
+        )
 
-        return update_in_transaction()  # type: ignore[return-value]
+    def stop_whitelist_listener(self) -> None:
+        """Stop listening for whitelist changes."""
+        self._whitelist_watch.unsubscribe()  # type: ignore[no-untyped-call]
 
-    def get_whitelist(self) -> list[WhitelistItem]:
-        """Get all whitelist items for this family that apply to Windows."""
-        query = (
-            self._db.collection("whitelist")
-            .where("familyId", "==", self._family_id)
-            .where("platform", "in", [Platform.WINDOWS.value, Platform.BOTH.value])
-        )
-        return [
-            WhitelistItem.model_validate(firestore_to_dict(doc.to_dict()))
-            for doc in query.stream()
-        ]
+    def _on_whitelist_snapshot(self, docs: Any, changes: Any, read_time: Any) -> None:
+        """Apply whitelist changes pushed by the snapshot listener.
 
-    def is_whitelisted(self, exe_name: str, whitelist: list[WhitelistItem]) -> bool:
-        """Check if an executable is in the whitelist."""
-        exe_lower = exe_name.lower()
-        return any(item.identifier.lower() == exe_lower for item in whitelist)
+        Runs on the listener's thread. Malformed documents are skipped; any
+        other failure drops the cached items so get_whitelist queries instead,
+        until the next snapshot rebuilds them from the full document list.
+        """
+        with self._whitelist_lock:
+            try:
+                if self._whitelist_items is None:
+                    items: dict[str, WhitelistItem] = {}
+                    updated = docs
+                else:
+                    items = self._whitelist_items
+                    updated = []
+                    for change in changes:
+                        if change.type.name == "REMOVED":
+                            items.pop(change.document.id, None)
+                        else:
+                            updated.append(change.document)
+                for doc in updated:
+                    try:
+                        items[doc.id] = WhitelistItem.model_validate(doc.to_dict())
+                    except ValidationError:
+                        logger.warning("Skipping invalid whitelist document %s", doc.id)
+                        items.pop(doc.id, None)
+                self._whitelist_items = items
+            except Exception:
+                logger.exception("Failed to apply whitelist snapshot")
+                self._whitelist_items = None
+
+    def is_whitelisted(
+        self, exe_lower: str, whitelist_index: Mapping[str, WhitelistItem]
+    ) -> bool:
+        """Check if an executable is in the whitelist.
+
+        `whitelist_index` is keyed by lowercased identifier and `exe_lower`
+        must already be lowercased.
+        """
+        return exe_lower in whitelist_index
 
-    def log_app_usage(
+    def _add_usage_logs(
+        self, batch: Any, usage_logs: Sequence[tuple[str, float, bool]]
+    ) -> None:
+        """Add a usageLogs create to the batch for each usage log entry."""
+        for app_identifier, minutes, was_whitelisted in usage_logs:
+            batch.create(
+                self._usage_logs.document(),
+                self._usage_log_data(app_identifier, minutes, was_whitelisted),
+            )
+
+    def _usage_log_data(
         self,
         app_identifier: str,
-        app_display_name: str,
         minutes: float,
         was_whitelisted: bool,
-    ) -> None:
-        """Log app usage for analytics."""
-        today = datetime.now(UTC).strftime("%Y-%m-%d")
-        self._db.collection("usageLogs").add(
-            {
-                "familyId": self._family_id,
-                "userId": self._user_id,
-                "deviceId": self._device_id,
-                "platform": Platform.WINDOWS.value,
-                "date": today,
-                "appIdentifier": app_identifier,
-                "appDisplayName": app_display_name,
-                "minutes": minutes,
-                "wasWhitelisted": was_whitelisted,
-            }
-        )
+    ) -> dict[str, Any]:
+        """Build a usageLogs document for analytics."""
+        return {
+            "familyId": self._family_id,
+            "userId": self._user_id,
+            "deviceId": self._device_id,
+            "platform": Platform.WINDOWS.value,
+            "date": datetime.now(UTC).strftime("%Y-%m-%d"),
+            "appIdentifier": app_identifier,
+            "appDisplayName": app_identifier,
+            "minutes": minutes,
+            "wasWhitelisted": was_whitelisted,
+        }
 
     def reset_daily_counter(self, today: str) -> None:
         """Reset the daily usage counter for the user."""
-        user_ref = self._db.collection("users").document(self._user_id)
-        user_ref.update(
+        self._user_ref.update(
             {
                 "todayUsedMinutes": 0.0,
                 "lastResetDate": today,
@@ -124,15 +220,9 @@ class FirestoreClient:
 
         Returns the list of approved extensions that were found.
         """
-        query = (
-            self._db.collection("extensionRequests")
-            .where("deviceId", "==", self._device_id)
-            .where("status", "==", RequestStatus.APPROVED.value)
-        )
-
         approved: list[ExtensionRequest] = []
-        for doc in query.stream():
-            ext = ExtensionRequest.model_validate(firestore_to_dict(doc.to_dict()))
+        for doc in self._approved_extensions_query.stream():
+            ext = ExtensionRequest.model_validate(doc.to_dict())
             approved.append(ext)
             # Mark as processed by updating status to prevent re-processing
             doc.reference.update({"status": "processed"})
@@ -145,7 +235,7 @@ class FirestoreClient:
         Returns the request ID.
         """
         now = datetime.now(UTC)
-        doc_ref = self._db.collection("extensionRequests").add(
+        doc_ref = self._extension_requests.add(
             {
                 "familyId": self._family_id,
                 "userId": self._user_id,
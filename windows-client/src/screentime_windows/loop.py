@@ -1,10 +1,15 @@
 """Main monitoring loop for the Windows screen time service."""
 
 import logging
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from dataclasses import dataclass, field
-from datetime import UTC, date, datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from screentime_shared import WhitelistItem
 
@@ -12,22 +17,58 @@ from .cache import LocalCache
 from .firebase_client import FirestoreClient
 from .lock import lock_workstation
 from .monitor import get_foreground_exe
-from .notify import NotificationState, should_show_warning, show_time_warning
-from .tray import TrayManager
+from .notify import (
+    MAX_WARNING_MINUTES,
+    NotificationState,
+    should_show_warning,
+    show_time_warning,
+)
+
+if TYPE_CHECKING:
+    from .tray import TrayManager
 
 logger = logging.getLogger(__name__)
 
+# Online time is accumulated locally and added to Firestore as an Increment
+# in the tick batch once this much has built up (or the limit is reached).
+_TIME_SYNC_SECONDS = 60.0
+# Longest stretch of one app covered by a single usage log
+_USAGE_LOG_SECONDS = 60.0
+# Most finished usage logs kept while writes can't keep up; oldest are dropped
+_USAGE_LOG_BUFFER = 256
+
 
 @dataclass
 class MonitorState:
     """Mutable state for the monitoring loop."""
 
     whitelist: list[WhitelistItem] = field(default_factory=list)
-    last_whitelist_refresh: datetime | None = None
+    whitelist_index: dict[str, WhitelistItem] = field(default_factory=dict)
+    whitelist_display: tuple[str, ...] = ()
+    last_whitelist_refresh: float | None = None  # time.monotonic()
     last_foreground_exe: str | None = None
+    last_foreground_exe_lower: str | None = None
+    last_foreground_whitelisted: bool = False
     daily_limit_minutes: int = 120
     today_used_minutes: float = 0.0
+    pending_online_seconds: float = 0.0
+    # Firestore write for the previous tick, running on the writer thread,
+    # and the used seconds it carries
+    tick_write: Future[float | None] | None = None
+    tick_write_seconds: float = 0.0
+    # Foreground app time is aggregated into one usage log per run of the same
+    # app (capped at _USAGE_LOG_SECONDS). Finished runs wait in usage_logs as
+    # (app_identifier, minutes, was_whitelisted) until the next tick write.
+    usage_app: str | None = None
+    usage_whitelisted: bool = False
+    usage_minutes: float = 0.0
+    usage_started: float = 0.0  # time.monotonic()
+    usage_logs: deque[tuple[str, float, bool]] = field(
+        default_factory=lambda: deque(maxlen=_USAGE_LOG_BUFFER)
+    )
     last_reset_date: str = ""
+    next_day_check: float = 0.0  # Epoch time of the next local midnight
+    user_state_dirty: bool = False  # Limit/used/reset date not yet cached
     is_locked: bool = False
     is_online: bool = True
     notifications: NotificationState = field(default_factory=NotificationState)
@@ -39,11 +80,17 @@ def run_monitoring_loop(
     whitelist_refresh_seconds: int = 60,
     cache_dir: Path | None = None,
     enable_tray: bool = True,
+    stop_event: threading.Event | None = None,
 ) -> None:
-    """Run the main monitoring loop. Does not return unless interrupted."""
+    """Run the main monitoring loop.
+
+    Returns when interrupted, when quit is chosen from the tray, or when
+    stop_event is set. Unsynced time is flushed before returning.
+    """
     state = MonitorState()
     cache = LocalCache(cache_dir or Path.home() / ".screentime" / "cache")
-    stop_requested = False
+    if stop_event is None:
+        stop_event = threading.Event()
 
     def request_extension(minutes: int) -> None:
         """Callback for extension request from tray."""
@@ -55,12 +102,15 @@ def run_monitoring_loop(
 
     def request_quit() -> None:
         """Callback for quit from tray."""
-        nonlocal stop_requested
-        stop_requested = True
+        stop_event.set()
 
     # Set up tray icon
-    tray: TrayManager | None = None
+    tray: "TrayManager | None" = None
     if enable_tray:
+        # Imported here so the service, which runs without a tray, never
+        # loads PIL and pystray
+        from .tray import TrayManager
+
         tray = TrayManager(
             on_request_extension=request_extension,
             on_quit=request_quit,
@@ -77,10 +127,22 @@ def run_monitoring_loop(
         state.is_online,
     )
 
+    # Firestore writes run on their own thread so network latency doesn't
+    # delay the next poll. Only the loop thread mutates MonitorState.
+    writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="firestore-writer")
+
+    next_tick = time.monotonic()
     try:
-        while not stop_requested:
+        while not stop_event.is_set():
             try:
-                _tick(client, state, cache, poll_interval_seconds, whitelist_refresh_seconds)
+                _tick(
+                    client,
+                    state,
+                    cache,
+                    writer,
+                    poll_interval_seconds,
+                    whitelist_refresh_seconds,
+                )
 
                 # Update tray icon
                 if tray:
@@ -92,10 +154,22 @@ def run_monitoring_loop(
             except Exception:
                 logger.exception("Error in monitoring loop tick")
 
-            time.sleep(poll_interval_seconds)
+            _save_user_state(state, cache)
+
+            # Schedule from the previous deadline so tick duration doesn't
+            # cause drift, but don't try to catch up on missed ticks
+            next_tick = max(next_tick + poll_interval_seconds, time.monotonic())
+            stop_event.wait(next_tick - time.monotonic())
     finally:
         if tray:
             tray.stop()
+        client.stop_whitelist_listener()
+        _collect_tick_write(state, cache, timeout=None)
+        writer.shutdown()
+        if state.is_online:
+            _sync_online_time(client, state, cache)
+            _flush_usage_logs(client, state)
+        _save_user_state(state, cache)
 
 
 def _initial_sync(
@@ -116,7 +190,7 @@ def _initial_sync(
     # Try to load from Firestore
     try:
         _refresh_whitelist(client, state, cache)
-        _sync_user_state(client, state, cache)
+        _sync_user_state(client, state)
         state.is_online = True
     except Exception:
         logger.warning("Failed to connect to Firestore, using cached data")
@@ -128,7 +202,7 @@ def _load_from_cache(state: MonitorState, cache: LocalCache) -> None:
     """Load state from local cache."""
     whitelist = cache.load_whitelist()
     if whitelist is not None:
-        state.whitelist = whitelist
+        _set_whitelist(state, whitelist)
         logger.info("Loaded %d whitelist items from cache", len(whitelist))
 
     user_state = cache.load_user_state()
@@ -143,16 +217,21 @@ def _tick(
     client: FirestoreClient,
     state: MonitorState,
     cache: LocalCache,
+    writer: ThreadPoolExecutor,
     poll_interval_seconds: int,
     whitelist_refresh_seconds: int,
 ) -> None:
     """Single iteration of the monitoring loop."""
-    now = datetime.now(UTC)
+    # Apply the result of the previous tick's write without waiting for it, so
+    # a slow RPC never delays the poll or a stop request. If it is still in
+    # flight, this tick's write is skipped and its time carried to the next.
+    write_done = _collect_tick_write(state, cache, timeout=0)
 
     # Refresh whitelist periodically
-    if _should_refresh_whitelist(state, now, whitelist_refresh_seconds):
+    if _should_refresh_whitelist(state, whitelist_refresh_seconds):
         try:
-            _refresh_whitelist(client, state, cache)
+            # While offline, query Firestore directly to probe the connection
+            _refresh_whitelist(client, state, cache, force=not state.is_online)
             # If we were offline and are now online, sync pending time
             if not state.is_online:
                 _sync_pending_time(client, cache)
@@ -160,52 +239,45 @@ def _tick(
         except Exception:
             if state.is_online:
                 logger.warning("Lost connection to Firestore, switching to offline mode")
+                _queue_online_time(state, cache)
             state.is_online = False
 
-    # Check for daily reset
-    today = date.today().isoformat()
-    if state.last_reset_date != today:
-        _handle_daily_reset(client, state, cache, today)
+    # Check for daily reset (only once per local day boundary)
+    if time.time() >= state.next_day_check:
+        today = date.today().isoformat()
+        if state.last_reset_date != today:
+            _handle_daily_reset(client, state, cache, today)
+        state.notifications.reset_if_new_day(today)
+        state.next_day_check = _next_local_midnight()
 
     # Get current foreground app
     exe_name = get_foreground_exe()
-    state.last_foreground_exe = exe_name
+    if exe_name != state.last_foreground_exe:
+        state.last_foreground_exe = exe_name
+        state.last_foreground_exe_lower = exe_name.lower() if exe_name is not None else None
 
-    # Update device status in Firestore (if online)
-    if state.is_online:
-        try:
-            client.update_device_status(
-                current_app=exe_name,
-                current_app_package=exe_name,
-            )
-        except Exception:
-            logger.debug("Failed to update device status")
+    # Check if whitelisted
+    exe_lower = state.last_foreground_exe_lower
+    is_whitelisted = exe_lower is not None and client.is_whitelisted(
+        exe_lower, state.whitelist_index
+    )
+    state.last_foreground_whitelisted = is_whitelisted
+    _track_usage(state, exe_name, is_whitelisted, poll_interval_seconds)
+
+    if exe_name is not None:
+        if is_whitelisted:
+            logger.debug("App %s is whitelisted, not counting time", exe_name)
+        else:
+            _increment_time(state, cache, poll_interval_seconds)
+
+    # Write device status, due used time and usage log (if online)
+    if state.is_online and write_done:
+        _submit_tick_write(client, state, writer, exe_name)
 
     if exe_name is None:
         logger.debug("No foreground window detected")
         return
 
-    # Check if whitelisted
-    is_whitelisted = client.is_whitelisted(exe_name, state.whitelist)
-
-    if is_whitelisted:
-        logger.debug("App %s is whitelisted, not counting time", exe_name)
-    else:
-        # Increment used time
-        _increment_time(client, state, cache, poll_interval_seconds)
-
-    # Log usage for analytics (if online)
-    if state.is_online:
-        try:
-            client.log_app_usage(
-                app_identifier=exe_name,
-                app_display_name=exe_name,
-                minutes=poll_interval_seconds / 60.0,
-                was_whitelisted=is_whitelisted,
-            )
-        except Exception:
-            logger.debug("Failed to log app usage")
-
     # Check for approved extension requests (if online)
     if state.is_online:
         _check_extension_approvals(client, state)
@@ -227,37 +299,187 @@ def _tick(
         state.is_locked = False
 
 
-def _increment_time(
+def _increment_time(state: MonitorState, cache: LocalCache, seconds: float) -> None:
+    """Increment used time locally, queueing it for sync.
+
+    While online, time is accumulated in memory and written by
+    _submit_tick_write (via FirestoreClient.commit_tick) once enough has
+    built up; while offline it goes to the pending queue.
+    """
+    state.today_used_minutes += seconds / 60.0
+    if state.is_online:
+        state.pending_online_seconds += seconds
+    else:
+        cache.add_pending_time(seconds)
+        logger.debug("Queued time locally, local total: %.1f minutes", state.today_used_minutes)
+
+    state.user_state_dirty = True
+
+
+def _submit_tick_write(
     client: FirestoreClient,
     state: MonitorState,
-    cache: LocalCache,
-    seconds: float,
+    writer: ThreadPoolExecutor,
+    exe_name: str | None,
 ) -> None:
-    """Increment used time, with offline fallback."""
-    if state.is_online:
-        try:
-            new_total = client.increment_used_time(seconds)
-            state.today_used_minutes = new_total
-            cache.save_user_state(
-                state.daily_limit_minutes,
-                state.today_used_minutes,
-                state.last_reset_date,
-            )
-            logger.debug("Synced time, total used: %.1f minutes", new_total)
-            return
-        except Exception:
-            logger.debug("Failed to sync time, queueing locally")
-            state.is_online = False
+    """Queue this tick's Firestore writes on the writer thread.
+
+    Accumulated used time is included once enough has built up or the local
+    total reaches the daily limit, along with any finished usage logs.
+    """
+    sync_due = (
+        state.pending_online_seconds >= _TIME_SYNC_SECONDS
+        or state.today_used_minutes >= state.daily_limit_minutes
+    )
+    used_seconds = state.pending_online_seconds if sync_due else 0.0
+    if used_seconds:
+        state.pending_online_seconds = 0.0
+    usage_logs = tuple(state.usage_logs)
+    state.usage_logs.clear()
+    state.tick_write_seconds = used_seconds
+    state.tick_write = writer.submit(_write_tick, client, exe_name, used_seconds, usage_logs)
 
-    # Offline: track locally
-    cache.add_pending_time(seconds)
-    state.today_used_minutes += seconds / 60.0
+
+def _write_tick(
+    client: FirestoreClient,
+    exe_name: str | None,
+    used_seconds: float,
+    usage_logs: tuple[tuple[str, float, bool], ...],
+) -> float | None:
+    """Write one tick's updates (runs on the writer thread).
+
+    Raises if the used time and usage logs couldn't be written. The device
+    status is best-effort and doesn't affect the result.
+
+    Returns the new total used minutes if used time was synced and could be
+    read back, else None.
+    """
+    client.commit_tick(used_seconds=used_seconds, usage_logs=usage_logs)
+    try:
+        client.update_device_status(current_app=exe_name)
+    except Exception:
+        logger.debug("Failed to update device status")
+    if not used_seconds:
+        return None
+    try:
+        # Pick up time counted on other devices
+        return client.get_used_minutes()
+    except Exception:
+        logger.debug("Failed to read back used time")
+        return None
+
+
+def _collect_tick_write(
+    state: MonitorState, cache: LocalCache, timeout: float | None
+) -> bool:
+    """Apply the outcome of the in-flight tick write, if any.
+
+    Returns False if the write is still running after timeout.
+    """
+    future = state.tick_write
+    if future is None:
+        return True
+    try:
+        new_total = future.result(timeout=timeout)
+    except FutureTimeoutError:
+        return False
+    except Exception:
+        logger.warning("Failed to write to Firestore, switching to offline mode")
+        state.is_online = False
+        state.pending_online_seconds += state.tick_write_seconds
+        _queue_online_time(state, cache)
+        new_total = None
+    finally:
+        if future.done():
+            state.tick_write = None
+            state.tick_write_seconds = 0.0
+
+    if new_total is not None:
+        # Time counted since the write was queued hasn't been synced yet
+        state.today_used_minutes = new_total + state.pending_online_seconds / 60.0
+        state.user_state_dirty = True
+        logger.debug("Synced time, total used: %.1f minutes", state.today_used_minutes)
+    return True
+
+
+def _track_usage(
+    state: MonitorState,
+    exe_name: str | None,
+    is_whitelisted: bool,
+    poll_interval_seconds: int,
+) -> None:
+    """Add this tick to the current usage run, finishing it if the app changed."""
+    now = time.monotonic()
+    if (
+        exe_name != state.usage_app
+        or is_whitelisted != state.usage_whitelisted
+        or now - state.usage_started >= _USAGE_LOG_SECONDS
+    ):
+        _finish_usage_run(state)
+        state.usage_app = exe_name
+        state.usage_whitelisted = is_whitelisted
+        state.usage_started = now
+    if exe_name is not None:
+        state.usage_minutes += poll_interval_seconds / 60.0
+
+
+def _finish_usage_run(state: MonitorState) -> None:
+    """Move the current usage run, if any, to the pending usage logs."""
+    if state.usage_app is not None and state.usage_minutes > 0:
+        state.usage_logs.append(
+            (state.usage_app, state.usage_minutes, state.usage_whitelisted)
+        )
+    state.usage_app = None
+    state.usage_minutes = 0.0
+
+
+def _flush_usage_logs(client: FirestoreClient, state: MonitorState) -> None:
+    """Write the current usage run and any pending usage logs to Firestore."""
+    _finish_usage_run(state)
+    if not state.usage_logs:
+        return
+    try:
+        client.log_app_usage(tuple(state.usage_logs))
+    except Exception:
+        logger.debug("Failed to write usage logs")
+    state.usage_logs.clear()
+
+
+def _save_user_state(state: MonitorState, cache: LocalCache) -> None:
+    """Write user state to the cache if it changed since the last write."""
+    if not state.user_state_dirty:
+        return
     cache.save_user_state(
         state.daily_limit_minutes,
         state.today_used_minutes,
         state.last_reset_date,
     )
-    logger.debug("Queued time locally, local total: %.1f minutes", state.today_used_minutes)
+    state.user_state_dirty = False
+
+
+def _sync_online_time(
+    client: FirestoreClient, state: MonitorState, cache: LocalCache
+) -> None:
+    """Push locally accumulated online time to Firestore."""
+    seconds = state.pending_online_seconds
+    if seconds <= 0:
+        return
+    state.pending_online_seconds = 0.0
+    try:
+        state.today_used_minutes = client.increment_used_time(seconds)
+        state.user_state_dirty = True
+        logger.debug("Synced time, total used: %.1f minutes", state.today_used_minutes)
+    except Exception:
+        logger.debug("Failed to sync time, queueing locally")
+        state.is_online = False
+        cache.add_pending_time(seconds)
+
+
+def _queue_online_time(state: MonitorState, cache: LocalCache) -> None:
+    """Move unsynced online time to the offline queue."""
+    if state.pending_online_seconds > 0:
+        cache.add_pending_time(state.pending_online_seconds)
+        state.pending_online_seconds = 0.0
 
 
 def _sync_pending_time(client: FirestoreClient, cache: LocalCache) -> None:
@@ -272,38 +494,45 @@ def _sync_pending_time(client: FirestoreClient, cache: LocalCache) -> None:
             logger.warning("Failed to sync pending time")
 
 
-def _should_refresh_whitelist(
-    state: MonitorState, now: datetime, refresh_seconds: int
-) -> bool:
+def _should_refresh_whitelist(state: MonitorState, refresh_seconds: int) -> bool:
     if state.last_whitelist_refresh is None:
         return True
-    elapsed = (now - state.last_whitelist_refresh).total_seconds()
-    return elapsed >= refresh_seconds
+    return time.monotonic() - state.last_whitelist_refresh >= refresh_seconds
 
 
 def _refresh_whitelist(
-    client: FirestoreClient, state: MonitorState, cache: LocalCache
+    client: FirestoreClient,
+    state: MonitorState,
+    cache: LocalCache,
+    force: bool = False,
 ) -> None:
-    """Refresh the whitelist from Firestore and cache it."""
-    state.whitelist = client.get_whitelist()
-    state.last_whitelist_refresh = datetime.now(UTC)
+    """Refresh the whitelist from Firestore and cache it.
+
+    The derived lookups and the cache file are only rebuilt if it changed.
+    """
+    whitelist = client.get_whitelist(force_refresh=force)
+    state.last_whitelist_refresh = time.monotonic()
+    if whitelist == state.whitelist:
+        return
+    _set_whitelist(state, whitelist)
     cache.save_whitelist(state.whitelist)
     logger.debug("Refreshed whitelist: %d items", len(state.whitelist))
 
 
-def _sync_user_state(
-    client: FirestoreClient, state: MonitorState, cache: LocalCache
-) -> None:
+def _set_whitelist(state: MonitorState, whitelist: list[WhitelistItem]) -> None:
+    """Replace the whitelist and the lookups derived from it."""
+    state.whitelist = whitelist
+    state.whitelist_index = {item.identifier.lower(): item for item in whitelist}
+    state.whitelist_display = tuple(item.display_name for item in whitelist)
+
+
+def _sync_user_state(client: FirestoreClient, state: MonitorState) -> None:
     """Sync user state (limit, used time) from Firestore."""
     user = client.get_user()
     state.daily_limit_minutes = user.daily_limit_minutes
     state.today_used_minutes = user.today_used_minutes
     state.last_reset_date = user.last_reset_date
-    cache.save_user_state(
-        state.daily_limit_minutes,
-        state.today_used_minutes,
-        state.last_reset_date,
-    )
+    state.user_state_dirty = True
     logger.debug(
         "Synced user state: limit=%d, used=%.1f, reset_date=%s",
         state.daily_limit_minutes,
@@ -312,6 +541,12 @@ def _sync_user_state(
     )
 
 
+def _next_local_midnight() -> float:
+    """Epoch time of the start of tomorrow in local time."""
+    tomorrow = date.today() + timedelta(days=1)
+    return datetime.combine(tomorrow, datetime.min.time()).timestamp()
+
+
 def _handle_daily_reset(
     client: FirestoreClient,
     state: MonitorState,
@@ -320,6 +555,10 @@ def _handle_daily_reset(
 ) -> None:
     """Handle daily counter reset."""
     logger.info("New day detected (%s), resetting counter", today)
+    # Attribute time accumulated before midnight to the previous day
+    _collect_tick_write(state, cache, timeout=None)
+    if state.is_online:
+        _sync_online_time(client, state, cache)
     if state.is_online:
         try:
             client.reset_daily_counter(today)
@@ -328,11 +567,7 @@ def _handle_daily_reset(
     state.today_used_minutes = 0.0
     state.last_reset_date = today
     state.is_locked = False
-    cache.save_user_state(
-        state.daily_limit_minutes,
-        state.today_used_minutes,
-        state.last_reset_date,
-    )
+    state.user_state_dirty = True
 
 
 def _check_extension_approvals(client: FirestoreClient, state: MonitorState) -> None:
@@ -341,6 +576,7 @@ def _check_extension_approvals(client: FirestoreClient, state: MonitorState) ->
         approved = client.get_and_clear_approved_extensions()
         for ext in approved:
             state.daily_limit_minutes += ext.requested_minutes
+            state.user_state_dirty = True
             logger.info(
                 "Applied extension of %d minutes, new limit: %d",
                 ext.requested_minutes,
@@ -352,12 +588,10 @@ def _check_extension_approvals(client: FirestoreClient, state: MonitorState) ->
 
 def _check_time_warnings(state: MonitorState, is_whitelisted: bool) -> None:
     """Check if we should show a time warning notification."""
-    # Reset notification state on new day
-    today = date.today().isoformat()
-    state.notifications.reset_if_new_day(today)
-
     # Calculate remaining time
     minutes_remaining = state.daily_limit_minutes - state.today_used_minutes
+    if minutes_remaining > MAX_WARNING_MINUTES:
+        return
 
     # Check if we should show a warning
     warning_level = should_show_warning(
@@ -368,23 +602,20 @@ def _check_time_warnings(state: MonitorState, is_whitelisted: bool) -> None:
 
     if warning_level is not None:
         if show_time_warning(warning_level, minutes_remaining):
-            state.notifications.shown_warnings.add(warning_level)
+            state.notifications.mark_shown(warning_level)
 
 
-def _update_tray(tray: TrayManager, state: MonitorState) -> None:
-    """Update the system tray icon with current state."""
-    minutes_remaining = state.daily_limit_minutes - state.today_used_minutes
-    is_whitelisted = state.last_foreground_exe is not None and any(
-        item.identifier.lower() == state.last_foreground_exe.lower()
-        for item in state.whitelist
-    )
+def _update_tray(tray: "TrayManager", state: MonitorState) -> None:
+    """Update the system tray icon with current state.
 
+    TrayManager skips the redraw when nothing it displays has changed.
+    """
     tray.update(
-        minutes_remaining=minutes_remaining,
+        minutes_remaining=state.daily_limit_minutes - state.today_used_minutes,
         minutes_used=state.today_used_minutes,
         daily_limit=state.daily_limit_minutes,
         current_app=state.last_foreground_exe,
-        is_whitelisted=is_whitelisted,
+        is_whitelisted=state.last_foreground_whitelisted,
         is_online=state.is_online,
-        whitelist=[item.display_name for item in state.whitelist],
+        whitelist=state.whitelist_display,
     )
@@ -4,13 +4,12 @@ import argparse
 import logging
 import sys
 from pathlib import Path
-
-import firebase_admin  # type: ignore[import-untyped]
-from firebase_admin import credentials, firestore  # type: ignore[import-untyped]
+from typing import TYPE_CHECKING, cast
 
 from .config import Config, load_config
-from .firebase_client import FirestoreClient
-from .loop import run_monitoring_loop
+
+if TYPE_CHECKING:
+    from google.cloud.firestore import Client  # type: ignore[import-untyped]
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +31,29 @@ def setup_logging(verbose: bool, log_file: Path | None = None) -> None:
     )
 
 
-def init_firebase(config: Config) -> firestore.Client:
-    """Initialize Firebase Admin SDK and return Firestore client."""
-    cred = credentials.Certificate(str(config.firebase_credentials_path))
-    firebase_admin.initialize_app(cred)
-    return firestore.client()
+def init_firebase(config: Config) -> "Client":
+    """Initialize Firebase Admin SDK and return Firestore client.
+
+    Safe to call more than once: the default app is only initialized the
+    first time, and firestore.client() returns the app's existing client.
+    """
+    # Imported here so install/uninstall don't pay for loading the SDK
+    import firebase_admin  # type: ignore[import-untyped]
+    from firebase_admin import credentials, firestore  # type: ignore[import-untyped]
+
+    try:
+        app = firebase_admin.get_app()
+    except ValueError:
+        cred = credentials.Certificate(str(config.firebase_credentials_path))
+        app = firebase_admin.initialize_app(cred)
+    return cast("Client", firestore.client(app))
 
 
 def cmd_run(args: argparse.Namespace) -> None:
     """Run the screen time tracker interactively."""
+    from .firebase_client import FirestoreClient
+    from .loop import run_monitoring_loop
+
     setup_logging(args.verbose)
 
     config_path: Path = args.config
@@ -90,9 +103,30 @@ def cmd_service(args: argparse.Namespace) -> None:
 
 def main() -> None:
     """Main entry point."""
+    # Options for running the tracker, shared by the root parser (default
+    # command) and the explicit "run" subcommand
+    run_options = argparse.ArgumentParser(add_help=False)
+    run_options.add_argument(
+        "--config", "-c",
+        type=Path,
+        default=Path("config.json"),
+        help="Path to configuration file",
+    )
+    run_options.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Enable verbose logging",
+    )
+    run_options.add_argument(
+        "--no-tray",
+        action="store_true",
+        help="Disable system tray icon",
+    )
+
     parser = argparse.ArgumentParser(
         description="Screen Time Tracker for Windows",
         formatter_class=argparse.RawDescriptionHelpFormatter,
+        parents=[run_options],
         epilog="""
 Examples:
   screentime                     Run interactively with tray icon
@@ -103,26 +137,14 @@ Examples:
   net stop ScreenTimeTracker     Stop the installed service
 """,
     )
+    # Run if no subcommand is given
+    parser.set_defaults(func=cmd_run)
 
     subparsers = parser.add_subparsers(dest="command")
 
-    # Run command (default)
-    run_parser = subparsers.add_parser("run", help="Run interactively")
-    run_parser.add_argument(
-        "--config", "-c",
-        type=Path,
-        default=Path("config.json"),
-        help="Path to configuration file",
-    )
-    run_parser.add_argument(
-        "--verbose", "-v",
-        action="store_true",
-        help="Enable verbose logging",
-    )
-    run_parser.add_argument(
-        "--no-tray",
-        action="store_true",
-        help="Disable system tray icon",
+    # Run command
+    run_parser = subparsers.add_parser(
+        "run", help="Run interactively", parents=[run_options]
     )
     run_parser.set_defaults(func=cmd_run)
 
@@ -144,31 +166,8 @@ Examples:
     service_parser = subparsers.add_parser("service", help=argparse.SUPPRESS)
     service_parser.set_defaults(func=cmd_service)
 
-    # Add common args to main parser for default behavior
-    parser.add_argument(
-        "--config", "-c",
-        type=Path,
-        default=Path("config.json"),
-        help="Path to configuration file",
-    )
-    parser.add_argument(
-        "--verbose", "-v",
-        action="store_true",
-        help="Enable verbose logging",
-    )
-    parser.add_argument(
-        "--no-tray",
-        action="store_true",
-        help="Disable system tray icon",
-    )
-
     args = parser.parse_args()
-
-    # Default to run if no subcommand
-    if args.command is None:
-        cmd_run(args)
-    else:
-        args.func(args)
+    args.func(args)
 
 
 if __name__ == "__main__":
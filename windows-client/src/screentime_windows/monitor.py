@@ -7,18 +7,30 @@ if sys.platform == "win32":
     import win32process
     import psutil
 
+    # Last resolved (hwnd, pid) and its exe name, so an unchanged foreground
+    # window doesn't go through psutil on every poll
+    _last_window: tuple[int, int] | None = None
+    _last_name: str | None = None
+
     def get_foreground_exe() -> str | None:
         """Get the executable name of the current foreground window."""
+        global _last_window, _last_name
+
         hwnd = win32gui.GetForegroundWindow()
         if not hwnd:
             return None
 
         _, pid = win32process.GetWindowThreadProcessId(hwnd)
+        if (hwnd, pid) == _last_window:
+            return _last_name
+
         try:
-            process = psutil.Process(pid)
-            return process.name()
+            name: str | None = psutil.Process(pid).name()
         except (psutil.NoSuchProcess, psutil.AccessDenied):
-            return None
+            name = None
+        _last_window = (hwnd, pid)
+        _last_name = name
+        return name
 
 else:
     # Stub for non-Windows development
@@ -1,8 +1,9 @@
 """Windows toast notifications for time warnings."""
 
+import bisect
 import logging
 import sys
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import IntEnum
 
 logger = logging.getLogger(__name__)
@@ -16,29 +17,41 @@ class WarningLevel(IntEnum):
     ONE_MINUTE = 1
 
 
+# Warning levels in ascending threshold order, for bisect lookup
+_LEVELS = (WarningLevel.ONE_MINUTE, WarningLevel.FIVE_MINUTES, WarningLevel.TEN_MINUTES)
+_THRESHOLDS = tuple(int(level) for level in _LEVELS)
+MAX_WARNING_MINUTES = _THRESHOLDS[-1]
+# One bit per level in NotificationState.shown_warnings
+_BIT = {level: 1 << i for i, level in enumerate(_LEVELS)}
+
+
 @dataclass
 class NotificationState:
     """Tracks which warnings have been shown today."""
 
-    shown_warnings: set[WarningLevel] = field(default_factory=set)
+    shown_warnings: int = 0  # Bitmask of shown levels, see _BIT
     last_reset_date: str = ""
 
+    def has_shown(self, level: WarningLevel) -> bool:
+        """Check whether a warning level has been shown today."""
+        return bool(self.shown_warnings & _BIT[level])
+
+    def mark_shown(self, level: WarningLevel) -> None:
+        """Record that a warning level has been shown."""
+        self.shown_warnings |= _BIT[level]
+
     def reset_if_new_day(self, today: str) -> None:
         """Reset shown warnings on new day."""
         if self.last_reset_date != today:
-            self.shown_warnings.clear()
+            self.shown_warnings = 0
             self.last_reset_date = today
 
 
 def get_warning_level(minutes_remaining: float) -> WarningLevel | None:
     """Get the warning level for remaining time, if any."""
-    if minutes_remaining <= WarningLevel.ONE_MINUTE:
-        return WarningLevel.ONE_MINUTE
-    elif minutes_remaining <= WarningLevel.FIVE_MINUTES:
-        return WarningLevel.FIVE_MINUTES
-    elif minutes_remaining <= WarningLevel.TEN_MINUTES:
-        return WarningLevel.TEN_MINUTES
-    return None
+    # Index of the smallest threshold >= minutes_remaining
+    i = bisect.bisect_left(_THRESHOLDS, minutes_remaining)
+    return _LEVELS[i] if i < len(_LEVELS) else None
 
 
 def should_show_warning(
@@ -50,14 +63,14 @@ def should_show_warning(
 
     Returns the warning level to show, or None if no warning needed.
     """
-    if is_whitelisted:
+    if is_whitelisted or minutes_remaining > MAX_WARNING_MINUTES:
         return None
 
     level = get_warning_level(minutes_remaining)
     if level is None:
         return None
 
-    if level in state.shown_warnings:
+    if state.has_shown(level):
         return None
 
     return level
@@ -1,24 +1,25 @@
 """Windows service wrapper for Screen Time Tracker."""
 
 import logging
+import logging.handlers
+import queue
 import sys
 import threading
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# How long a service stop waits for the monitoring loop to flush to Firestore
+_MONITOR_STOP_TIMEOUT_SECONDS = 20.0
+
 # Only import Windows service modules on Windows
 if sys.platform == "win32":
     import servicemanager  # type: ignore[import-untyped]
     import win32event  # type: ignore[import-untyped]
     import win32service  # type: ignore[import-untyped]
     import win32serviceutil  # type: ignore[import-untyped]
-    import firebase_admin  # type: ignore[import-untyped]
-    from firebase_admin import credentials, firestore  # type: ignore[import-untyped]
 
     from .config import Config, load_config
-    from .firebase_client import FirestoreClient
-    from .loop import run_monitoring_loop
 
     class ScreenTimeService(win32serviceutil.ServiceFramework):
         """Windows service for Screen Time Tracker."""
@@ -34,13 +35,19 @@ if sys.platform == "win32":
             win32serviceutil.ServiceFramework.__init__(self, args)
             self._stop_event = win32event.CreateEvent(None, 0, 0, None)
             self._monitor_thread: threading.Thread | None = None
-            self._stop_requested = False
+            # Tells the monitoring loop to flush unsynced time and return
+            self._monitor_stop = threading.Event()
+            self._log_listener: logging.handlers.QueueListener | None = None
 
         def SvcStop(self) -> None:
             """Handle service stop request."""
             logger.info("Service stop requested")
-            self.ReportServiceStatus(win32service.SERVICE_STOP_PENDING)
-            self._stop_requested = True
+            # Allow for the monitor loop's final Firestore sync, plus margin
+            self.ReportServiceStatus(
+                win32service.SERVICE_STOP_PENDING,
+                waitHint=int((_MONITOR_STOP_TIMEOUT_SECONDS + 5) * 1000),
+            )
+            self._monitor_stop.set()
             win32event.SetEvent(self._stop_event)
 
         def SvcDoRun(self) -> None:
@@ -63,6 +70,11 @@ if sys.platform == "win32":
                 (self._svc_name_, ""),
             )
 
+            # Flush queued log records before the process exits
+            if self._log_listener:
+                self._log_listener.stop()
+                self._log_listener = None
+
         def _run_service(self) -> None:
             """Run the monitoring service."""
             # Set up logging to Windows Event Log
@@ -76,47 +88,63 @@ if sys.platform == "win32":
             config = load_config(config_path)
             logger.info("Loaded config for device: %s", config.device_name)
 
-            # Initialize Firebase
-            cred = credentials.Certificate(str(config.firebase_credentials_path))
-            firebase_admin.initialize_app(cred)
-            db = firestore.client()
-
-            # Create client
-            client = FirestoreClient(
-                db=db,
-                device_id=config.device_id,
-                device_name=config.device_name,
-                family_id=config.family_id,
-                user_id=config.user_id,
-            )
-
-            # Run monitoring loop in background thread
-            # (so we can respond to stop events)
+            # Connect and run the monitoring loop in a background thread, so
+            # slow Firebase startup doesn't hold up the service control thread
+            self._monitor_stop = threading.Event()
             self._monitor_thread = threading.Thread(
                 target=self._run_monitor_loop,
-                args=(client, config),
+                args=(config,),
                 daemon=True,
             )
             self._monitor_thread.start()
 
-            # Wait for stop signal
-            while not self._stop_requested:
-                rc = win32event.WaitForSingleObject(self._stop_event, 5000)
-                if rc == win32event.WAIT_OBJECT_0:
-                    break
+            # Wait for stop signal; SvcStop sets the event, so no need to poll
+            win32event.WaitForSingleObject(self._stop_event, win32event.INFINITE)
 
             logger.info("Service stopping")
 
-        def _run_monitor_loop(self, client: FirestoreClient, config: Config) -> None:
-            """Run the monitoring loop (in background thread)."""
+            # Let the loop sync pending time and usage logs before the process
+            # exits; the thread is a daemon, so don't wait on it forever
+            self._monitor_stop.set()
+            self._monitor_thread.join(timeout=_MONITOR_STOP_TIMEOUT_SECONDS)
+            if self._monitor_thread.is_alive():
+                logger.warning("Monitor loop did not stop in time")
+
+        def _run_monitor_loop(self, config: Config) -> None:
+            """Connect to Firestore and run the monitoring loop (in background thread).
+
+            If this ends without a stop request, the service is stopped too,
+            rather than staying RUNNING without enforcing anything.
+            """
             try:
+                # Deferred so install/uninstall don't load Firebase or the loop
+                from .firebase_client import FirestoreClient
+                from .loop import run_monitoring_loop
+                from .main import init_firebase
+
+                # Reuses the app and client if the service ran before in this process
+                db = init_firebase(config)
+
+                client = FirestoreClient(
+                    db=db,
+                    device_id=config.device_id,
+                    device_name=config.device_name,
+                    family_id=config.family_id,
+                    user_id=config.user_id,
+                )
+
                 run_monitoring_loop(
                     client=client,
                     poll_interval_seconds=config.poll_interval_seconds,
                     enable_tray=False,  # No tray icon when running as service
+                    stop_event=self._monitor_stop,
                 )
             except Exception:
                 logger.exception("Monitor loop failed")
+            finally:
+                if not self._monitor_stop.is_set():
+                    logger.error("Monitor loop exited unexpectedly, stopping service")
+                    win32event.SetEvent(self._stop_event)
 
         def _setup_logging(self) -> None:
             """Configure logging for service mode."""
@@ -125,13 +153,23 @@ if sys.platform == "win32":
             log_dir.mkdir(parents=True, exist_ok=True)
             log_file = log_dir / "service.log"
 
+            # Log calls only enqueue; a listener thread does the file writes
+            log_queue: queue.Queue[logging.LogRecord] = queue.Queue()
+            self._log_listener = logging.handlers.QueueListener(
+                log_queue,
+                logging.FileHandler(log_file),
+                logging.StreamHandler(),
+                respect_handler_level=True,
+            )
+            self._log_listener.start()
+
+            # force replaces the previous run's QueueHandler, whose listener
+            # was stopped, when the service runs again in this process
             logging.basicConfig(
                 level=logging.INFO,
                 format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-                handlers=[
-                    logging.FileHandler(log_file),
-                    logging.StreamHandler(),
-                ],
+                handlers=[logging.handlers.QueueHandler(log_queue)],
+                force=True,
             )
 
         def _get_config_path(self) -> Path:
@@ -1,10 +1,12 @@
 """System tray icon for Screen Time Tracker."""
 
+import bisect
 import logging
 import threading
 from dataclasses import dataclass
 from enum import Enum
-from typing import Callable
+from functools import lru_cache
+from typing import Callable, Sequence
 
 from PIL import Image, ImageDraw, ImageFont
 from pystray import Icon, Menu, MenuItem
@@ -13,23 +15,25 @@ logger = logging.getLogger(__name__)
 
 
 class TrayColor(Enum):
-    """Color states for the tray icon."""
+    """Color states for the tray icon, as RGBA to match the icon image mode."""
 
-    GREEN = (76, 175, 80)    # > 30 min remaining
-    YELLOW = (255, 193, 7)   # 10-30 min remaining
-    RED = (244, 67, 54)      # < 10 min remaining
-    GRAY = (158, 158, 158)   # Paused/whitelisted
+    GREEN = (76, 175, 80, 255)    # > 30 min remaining
+    YELLOW = (255, 193, 7, 255)   # 10-30 min remaining
+    RED = (244, 67, 54, 255)      # < 10 min remaining
+    GRAY = (158, 158, 158, 255)   # Paused/whitelisted
+
+
+# Upper bound (inclusive) of remaining minutes for each color band, ascending.
+# Anything above the last threshold is GREEN.
+_COLOR_THRESHOLDS = (10, 30)
+_COLOR_BANDS = (TrayColor.RED, TrayColor.YELLOW, TrayColor.GREEN)
 
 
 def get_tray_color(minutes_remaining: float, is_whitelisted: bool) -> TrayColor:
     """Determine tray icon color based on remaining time."""
     if is_whitelisted:
         return TrayColor.GRAY
-    if minutes_remaining > 30:
-        return TrayColor.GREEN
-    if minutes_remaining > 10:
-        return TrayColor.YELLOW
-    return TrayColor.RED
+    return _COLOR_BANDS[bisect.bisect_left(_COLOR_THRESHOLDS, minutes_remaining)]
 
 
 def create_tray_icon_image(
@@ -37,7 +41,33 @@ def create_tray_icon_image(
     color: TrayColor,
     size: int = 64,
 ) -> Image.Image:
-    """Create a tray icon image showing remaining time."""
+    """Create a tray icon image showing remaining time.
+
+    Images are cached by what they display, so the returned image is shared
+    and must not be modified.
+    """
+    mins = max(0, int(minutes_remaining))
+    text = str(mins) if mins < 100 else "99+"
+    return _sized_tray_icon(text, color, size)
+
+
+# Icons are drawn once at this size and resampled for other sizes
+_MASTER_ICON_SIZE = 64
+
+
+@lru_cache(maxsize=256)
+def _sized_tray_icon(text: str, color: TrayColor, size: int) -> Image.Image:
+    """Get the tray icon for the given text, scaled to size."""
+    master = _render_tray_icon(text, color)
+    if size == _MASTER_ICON_SIZE:
+        return master
+    return master.resize((size, size), Image.Resampling.LANCZOS)
+
+
+@lru_cache(maxsize=256)
+def _render_tray_icon(text: str, color: TrayColor) -> Image.Image:
+    """Render a tray icon with the given text at the master size."""
+    size = _MASTER_ICON_SIZE
     img = Image.new("RGBA", (size, size), (0, 0, 0, 0))
     draw = ImageDraw.Draw(img)
 
@@ -48,16 +78,9 @@ def create_tray_icon_image(
         fill=color.value,
     )
 
-    # Draw time text
-    mins = max(0, int(minutes_remaining))
-    text = str(mins) if mins < 100 else "99+"
-
     # Try to use a reasonable font size
     font_size = size // 2 if len(text) <= 2 else size // 3
-    try:
-        font = ImageFont.truetype("arial.ttf", font_size)
-    except OSError:
-        font = ImageFont.load_default()
+    font = _get_font(font_size)
 
     # Center the text
     bbox = draw.textbbox((0, 0), text, font=font)
@@ -71,9 +94,25 @@ def create_tray_icon_image(
     return img
 
 
-@dataclass
+@lru_cache(maxsize=8)
+def _get_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Load the icon font at the given size, once per size."""
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+# Whitelist entries listed in the tray menu
+_MAX_MENU_WHITELIST = 10
+
+
+@dataclass(frozen=True, slots=True)
 class TrayState:
-    """State displayed in the tray icon."""
+    """State displayed in the tray icon.
+
+    Never mutated: TrayManager.update publishes a new snapshot instead.
+    """
 
     minutes_remaining: float = 120.0
     minutes_used: float = 0.0
@@ -91,12 +130,15 @@ class TrayManager:
         on_request_extension: Callable[[int], None] | None = None,
         on_quit: Callable[[], None] | None = None,
     ):
-        self._state = TrayState()
         self._icon: Icon | None = None
         self._on_request_extension = on_request_extension
         self._on_quit = on_quit
-        self._whitelist: list[str] = []
-        self._lock = threading.Lock()
+        # Displayed state and the whitelist entries shown in the menu (at most
+        # _MAX_MENU_WHITELIST). Replaced in one assignment by update(), so
+        # readers on pystray's thread always see a consistent pair.
+        self._snapshot: tuple[TrayState, tuple[str, ...]] = (TrayState(), ())
+        # Everything the icon, tooltip and menu show, as of the last update
+        self._last_fingerprint: tuple[object, ...] | None = None
 
     def start(self) -> None:
         """Start the tray icon in a background thread."""
@@ -126,72 +168,96 @@ class TrayManager:
         current_app: str | None,
         is_whitelisted: bool,
         is_online: bool,
-        whitelist: list[str] | None = None,
+        whitelist: Sequence[str] | None = None,
     ) -> None:
-        """Update the tray icon state."""
-        with self._lock:
-            self._state = TrayState(
-                minutes_remaining=minutes_remaining,
-                minutes_used=minutes_used,
-                daily_limit=daily_limit,
-                current_app=current_app,
-                is_whitelisted=is_whitelisted,
-                is_online=is_online,
-            )
-            if whitelist is not None:
-                self._whitelist = whitelist
+        """Update the tray icon state.
+
+        Does nothing if the visible state is unchanged since the last update.
+        Must only be called from one thread (the monitoring loop).
+        """
+        old_whitelist = self._snapshot[1]
+        if whitelist is not None:
+            whitelist = tuple(whitelist[:_MAX_MENU_WHITELIST])
+        else:
+            whitelist = old_whitelist
+        fingerprint = (
+            int(minutes_remaining),
+            int(minutes_used),
+            daily_limit,
+            get_tray_color(minutes_remaining, is_whitelisted),
+            current_app,
+            is_whitelisted,
+            is_online,
+            whitelist,
+        )
+        if fingerprint == self._last_fingerprint:
+            return
+        self._last_fingerprint = fingerprint
+
+        state = TrayState(
+            minutes_remaining=minutes_remaining,
+            minutes_used=minutes_used,
+            daily_limit=daily_limit,
+            current_app=current_app,
+            is_whitelisted=is_whitelisted,
+            is_online=is_online,
+        )
+        self._snapshot = (state, whitelist)
 
         if self._icon:
             self._icon.icon = self._create_icon()
             self._icon.title = self._get_tooltip()
-            # Update menu to reflect current state
-            self._icon.menu = self._create_menu()
+            # Status lines are computed from the snapshot when the menu is built,
+            # so only the whitelist submenu needs new MenuItems
+            if whitelist != old_whitelist:
+                self._icon.menu = self._create_menu()
+            else:
+                self._icon.update_menu()
 
     def _create_icon(self) -> Image.Image:
         """Create the current tray icon image."""
-        with self._lock:
-            color = get_tray_color(
-                self._state.minutes_remaining,
-                self._state.is_whitelisted,
-            )
-            return create_tray_icon_image(self._state.minutes_remaining, color)
+        state = self._snapshot[0]
+        color = get_tray_color(state.minutes_remaining, state.is_whitelisted)
+        return create_tray_icon_image(state.minutes_remaining, color)
 
     def _get_tooltip(self) -> str:
         """Get the tooltip text for the tray icon."""
-        with self._lock:
-            mins = int(self._state.minutes_remaining)
-            if self._state.is_whitelisted:
-                return f"Screen Time: {mins} min left (paused - whitelisted app)"
-            return f"Screen Time: {mins} min left"
-
-    def _create_menu(self) -> Menu:
-        """Create the right-click menu."""
-        with self._lock:
-            state = self._state
-            whitelist = self._whitelist.copy()
-
-        # Current status
+        state = self._snapshot[0]
+        mins = int(state.minutes_remaining)
+        if state.is_whitelisted:
+            return f"Screen Time: {mins} min left (paused - whitelisted app)"
+        return f"Screen Time: {mins} min left"
+
+    def _status_text(self, item: MenuItem) -> str:
+        """Menu text for the current app."""
+        state = self._snapshot[0]
         if state.current_app:
             if state.is_whitelisted:
-                status_text = f"✓ {state.current_app} (whitelisted)"
-            else:
-                status_text = f"● {state.current_app} (counting)"
-        else:
-            status_text = "No active app"
-
-        # Connection status
-        connection_text = "🟢 Online" if state.is_online else "🔴 Offline"
+                return f"✓ {state.current_app} (whitelisted)"
+            return f"● {state.current_app} (counting)"
+        return "No active app"
 
-        # Time info
+    def _time_text(self, item: MenuItem) -> str:
+        """Menu text for time used and remaining."""
+        state = self._snapshot[0]
         used = int(state.minutes_used)
         limit = state.daily_limit
         remaining = int(state.minutes_remaining)
-        time_text = f"{used}/{limit} min used ({remaining} left)"
+        return f"{used}/{limit} min used ({remaining} left)"
+
+    def _connection_text(self, item: MenuItem) -> str:
+        """Menu text for the connection status."""
+        state = self._snapshot[0]
+        return "🟢 Online" if state.is_online else "🔴 Offline"
+
+    def _create_menu(self) -> Menu:
+        """Create the right-click menu."""
+        whitelist = self._snapshot[1]
 
         items = [
-            MenuItem(status_text, None, enabled=False),
-            MenuItem(time_text, None, enabled=False),
-            MenuItem(connection_text, None, enabled=False),
+            MenuItem(self._status_text, None, enabled=False),
+            MenuItem(self._time_text, None, enabled=False),
+            MenuItem(self._connection_text, None, enabled=False),
             Menu.SEPARATOR,
             MenuItem(
                 "Request Extension",
@@ -205,7 +271,7 @@ class TrayManager:
                 "Whitelist",
                 Menu(*[
                     MenuItem(app, None, enabled=False)
-                    for app in (whitelist[:10] if whitelist else ["(empty)"])
+                    for app in (whitelist or ("(empty)",))
                 ]),
             ),
             Menu.SEPARATOR,
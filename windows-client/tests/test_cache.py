@@ -43,6 +43,18 @@ def test_pending_time_persists_to_disk(tmp_path: Path) -> None:
     assert total == 120.0
 
 
+def test_pending_time_reads_legacy_list(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "pending_time.json").write_text(
+        '[{"seconds": 30.0, "timestamp": "2024-01-15T10:00:00"},'
+        ' {"seconds": 12.5, "timestamp": "2024-01-15T10:05:00"}]'
+    )
+
+    cache = LocalCache(cache_dir)
+    assert cache.get_and_clear_pending_time() == 42.5
+
+
 def test_whitelist_round_trip(cache: LocalCache) -> None:
     items = [
         WhitelistItem(
@@ -70,6 +82,21 @@ def test_whitelist_round_trip(cache: LocalCache) -> None:
     assert loaded[1].display_name == "Education App"
 
 
+def test_whitelist_reads_legacy_wrapper(tmp_path: Path) -> None:
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    (cache_dir / "whitelist.json").write_text(
+        '{"items": [{"family_id": "fam1", "platform": "windows",'
+        ' "identifier": "notepad.exe", "display_name": "Notepad",'
+        ' "added_at": "2024-01-15T10:00:00"}],'
+        ' "cached_at": "2024-01-15T10:05:00"}'
+    )
+
+    loaded = LocalCache(cache_dir).load_whitelist()
+    assert loaded is not None
+    assert [item.identifier for item in loaded] == ["notepad.exe"]
+
+
 def test_whitelist_returns_none_when_no_cache(cache: LocalCache) -> None:
     assert cache.load_whitelist() is None
 
@@ -88,5 +115,17 @@ def test_user_state_round_trip(cache: LocalCache) -> None:
     assert state["last_reset_date"] == "2024-01-15"
 
 
+def test_user_state_skips_unchanged_write(cache: LocalCache, tmp_path: Path) -> None:
+    cache.save_user_state(90, 45.5, "2024-01-15")
+    state_path = tmp_path / "cache" / "user_state.json"
+    state_path.unlink()
+
+    cache.save_user_state(90, 45.5, "2024-01-15")
+    assert not state_path.exists()
+
+    cache.save_user_state(90, 46.0, "2024-01-15")
+    assert state_path.exists()
+
+
 def test_user_state_returns_none_when_no_cache(cache: LocalCache) -> None:
     assert cache.load_user_state() is None
@@ -62,7 +62,7 @@ class TestShouldShowWarning:
 
     def test_no_repeat_warning(self) -> None:
         state = NotificationState()
-        state.shown_warnings.add(WarningLevel.TEN_MINUTES)
+        state.mark_shown(WarningLevel.TEN_MINUTES)
 
         result = should_show_warning(
             minutes_remaining=8.0,
@@ -73,7 +73,7 @@ class TestShouldShowWarning:
 
     def test_shows_next_warning_level(self) -> None:
         state = NotificationState()
-        state.shown_warnings.add(WarningLevel.TEN_MINUTES)
+        state.mark_shown(WarningLevel.TEN_MINUTES)
 
         # Still above 5 min - no new warning
         result = should_show_warning(minutes_remaining=6.0, is_whitelisted=False, state=state)
@@ -87,20 +87,21 @@ class TestShouldShowWarning:
 class TestNotificationState:
     def test_reset_clears_warnings(self) -> None:
         state = NotificationState()
-        state.shown_warnings.add(WarningLevel.TEN_MINUTES)
-        state.shown_warnings.add(WarningLevel.FIVE_MINUTES)
+        state.mark_shown(WarningLevel.TEN_MINUTES)
+        state.mark_shown(WarningLevel.FIVE_MINUTES)
         state.last_reset_date = "2024-01-15"
 
         state.reset_if_new_day("2024-01-16")
 
-        assert len(state.shown_warnings) == 0
+        assert not state.has_shown(WarningLevel.TEN_MINUTES)
+        assert not state.has_shown(WarningLevel.FIVE_MINUTES)
         assert state.last_reset_date == "2024-01-16"
 
     def test_no_reset_same_day(self) -> None:
         state = NotificationState()
-        state.shown_warnings.add(WarningLevel.TEN_MINUTES)
+        state.mark_shown(WarningLevel.TEN_MINUTES)
         state.last_reset_date = "2024-01-15"
 
         state.reset_if_new_day("2024-01-15")
 
-        assert WarningLevel.TEN_MINUTES in state.shown_warnings
+        assert state.has_shown(WarningLevel.TEN_MINUTES)
@@ -28,24 +28,36 @@ class TestGetTrayColor:
 
 
 class TestCreateTrayIconImage:
-    def test_creates_image_with_correct_size(self) -> None:
-        img = create_tray_icon_image(45.0, TrayColor.GREEN, size=64)
-        assert img.size == (64, 64)
-
-    def test_creates_image_with_custom_size(self) -> None:
-        img = create_tray_icon_image(45.0, TrayColor.GREEN, size=32)
-        assert img.size == (32, 32)
-
-    def test_handles_large_numbers(self) -> None:
-        # Should show "99+" for large values
-        img = create_tray_icon_image(150.0, TrayColor.GREEN)
-        assert img is not None
-
-    def test_handles_zero(self) -> None:
-        img = create_tray_icon_image(0.0, TrayColor.RED)
-        assert img is not None
-
-    def test_handles_negative(self) -> None:
-        # Edge case: negative remaining time
-        img = create_tray_icon_image(-5.0, TrayColor.RED)
-        assert img is not None
+    @pytest.mark.parametrize(
+        ("minutes", "color", "size"),
+        [
+            (45.0, TrayColor.GREEN, 64),
+            (45.0, TrayColor.GREEN, 32),
+            # Should show "99+" for large values
+            (150.0, TrayColor.GREEN, 64),
+            (0.0, TrayColor.RED, 64),
+            # Edge case: negative remaining time
+            (-5.0, TrayColor.RED, 64),
+        ],
+    )
+    def test_creates_image_with_correct_size(
+        self, minutes: float, color: TrayColor, size: int
+    ) -> None:
+        img = create_tray_icon_image(minutes, color, size=size)
+        assert img.size == (size, size)
+
+    @pytest.mark.parametrize(
+        ("minutes", "same_display_minutes", "size"),
+        [
+            (45.2, 45.9, 64),
+            (45.2, 45.9, 32),
+            (150.0, 120.0, 64),
+            (-5.0, 0.0, 64),
+        ],
+    )
+    def test_reuses_image_for_same_display(
+        self, minutes: float, same_display_minutes: float, size: int
+    ) -> None:
+        # Minutes that render the same text share one cached image
+        img = create_tray_icon_image(minutes, TrayColor.GREEN, size=size)
+        assert create_tray_icon_image(same_display_minutes, TrayColor.GREEN, size=size) is img